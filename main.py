@@ -1,11 +1,18 @@
 from fastapi import FastAPI, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import Optional
 import random
-from datetime import datetime, timedelta
+import itertools
+import numpy as np
+from datetime import date, datetime, timedelta
+import asyncio
 import time
 from pydantic import BaseModel
 
-app = FastAPI(title="Kubernetes Cluster Monitor API")
+app = FastAPI(title="Kubernetes Cluster Monitor API", default_response_class=ORJSONResponse)
+
+# Shared generator for batched random draws
+RNG = np.random.default_rng()
 
 # Dummy service names
 SERVICES = [
@@ -17,9 +24,21 @@ SERVICES = [
     "api-gateway"
 ]
 
+# Above this many log lines, /logs generation runs in the default executor
+LOGS_OFFLOAD_THRESHOLD = 1000
+
+# How long a generated /metrics snapshot is served to repeat scrapes, in seconds
+METRICS_CACHE_TTL = 0.25
+METRICS_CACHE = {"ts": 0.0, "resp": None}
+
+# Target size of each chunk written by /logs/stream
+LOGS_STREAM_CHUNK_SIZE = 64 * 1024
+
 # Log level distribution
 LOG_LEVELS = ["INFO", "DEBUG", "WARN", "ERROR"]
 LOG_LEVEL_WEIGHTS = [0.6, 0.25, 0.1, 0.05]
+LOG_LEVEL_CUM = list(itertools.accumulate(LOG_LEVEL_WEIGHTS))
+LOG_LEVEL_TOTAL = LOG_LEVEL_CUM[-1]
 
 # Sample log messages
 LOG_MESSAGES = [
@@ -40,6 +59,25 @@ LOG_MESSAGES = [
     "Background task scheduled"
 ]
 
+# Messages split by whether they take a fill-in value, so the bucket can be pre-rolled
+LOG_MESSAGES_PLAIN = tuple(m for m in LOG_MESSAGES if "{}" not in m)
+LOG_MESSAGES_TEMPLATED = tuple(m for m in LOG_MESSAGES if "{}" in m)
+LOG_MESSAGES_PLAIN_SHARE = len(LOG_MESSAGES_PLAIN) / len(LOG_MESSAGES)
+
+# Log line layout: timestamp, level, service, message
+LOG_LINE_FORMAT = "%s [%s] [%s] %s"
+
+# Log timestamps, equivalent to strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+LOG_TIMESTAMP_FORMAT = "%04d-%02d-%02d %02d:%02d:%02d.%03d"
+# Commit dates, equivalent to strftime("%Y-%m-%d %H:%M:%S")
+COMMIT_DATE_FORMAT = "%04d-%02d-%02d %02d:%02d:%02d"
+US_PER_SEC = 1_000_000
+US_PER_DAY = 86400 * US_PER_SEC
+
+# Fill-in values for message templates, drawn uniformly per kind (inclusive ranges)
+LOG_FILL_FORMATS = ["user_{}", "{}", "resource_{}", "{}"]
+LOG_FILL_RANGES = [(1000, 9999), (200, 500), (1, 100), (64, 512)]
+
 # Commit message types and templates
 COMMIT_TYPES = ["feat", "fix", "refactor", "perf", "docs", "test", "chore"]
 COMMIT_MESSAGES = [
@@ -75,6 +113,18 @@ COMMIT_MESSAGES = [
     "improve security headers"
 ]
 
+# Git log style commit block: hash, author, date, service, type, message, files, insertions, deletions
+COMMIT_FORMAT = (
+    "commit %07x\n"
+    "Author: %s\n"
+    "Date:   %s\n"
+    "Service: %s\n"
+    "\n"
+    "    %s: %s\n"
+    "\n"
+    "    %d files changed, %d insertions(+), %d deletions(-)\n"
+)
+
 # Developer names
 DEVELOPERS = [
     "alice.chen",
@@ -105,6 +155,7 @@ class MetricsResponse(BaseModel):
     services: list[ServiceMetrics]
 
 
+# Commit schema; /commit_history formats commits straight to text without building these
 class Commit(BaseModel):
     commit_hash: str
     author: str
@@ -124,101 +175,171 @@ class CommitHistoryResponse(BaseModel):
     commits: str  # Concatenated commit history
 
 
-def generate_log_line(service: str, timestamp: datetime) -> str:
-    """Generate a single log line for a service"""
-    level = random.choices(LOG_LEVELS, weights=LOG_LEVEL_WEIGHTS)[0]
-    message = random.choice(LOG_MESSAGES)
-    
-    # Add random data to message templates
-    if "{}" in message:
-        replacements = [
-            f"user_{random.randint(1000, 9999)}",
-            str(random.randint(200, 500)),
-            f"resource_{random.randint(1, 100)}",
-            str(random.randint(64, 512))
-        ]
-        message = message.format(random.choice(replacements))
-    
-    timestamp_str = timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-    return f"{timestamp_str} [{level}] [{service}] {message}"
+def wall_clock_us(dt: datetime) -> int:
+    """
+    Wall-clock microseconds of a naive datetime counted from day 1 of the
+    proleptic Gregorian calendar, so `us // US_PER_DAY` is its date ordinal
+    """
+    return (
+        (dt.toordinal() * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second) * US_PER_SEC
+        + dt.microsecond
+    )
 
 
-def generate_service_metrics(service: str) -> ServiceMetrics:
-    """Generate metrics for a single service"""
+def split_wall_clock_us(us: int, dates: dict) -> tuple[int, int, int, int, int, int, int]:
+    """Split wall-clock microseconds into (year, month, day, hour, minute, second, microsecond)"""
+    day, us = divmod(us, US_PER_DAY)
+    ymd = dates.get(day)
+    if ymd is None:
+        d = date.fromordinal(day)
+        ymd = dates[day] = (d.year, d.month, d.day)
+    sec, us = divmod(us, US_PER_SEC)
+    minutes, sec = divmod(sec, 60)
+    hour, minute = divmod(minutes, 60)
+    return (*ymd, hour, minute, sec, us)
+
+
+def build_log_lines(num_logs: int, start_time: datetime) -> list[str]:
+    """Generate timestamp-ordered log lines for all services"""
+    # Split logs evenly across services, first services take the remainder
+    n = num_logs
+    logs_per_service, remainder = divmod(n, len(SERVICES))
+    service_counts = [logs_per_service + (1 if idx < remainder else 0) for idx in range(len(SERVICES))]
+    service_idx = np.repeat(np.arange(len(SERVICES)), service_counts)
+    
+    # Draw all random fields for every log line in one batch
+    us_offsets = (RNG.uniform(0, 3600, n) * US_PER_SEC).astype(np.int64)
+    levels_idx = np.searchsorted(LOG_LEVEL_CUM, RNG.random(n) * LOG_LEVEL_TOTAL, side="right")
+    is_templated = RNG.random(n) >= LOG_MESSAGES_PLAIN_SHARE
+    msg_idx = RNG.integers(0, np.where(is_templated, len(LOG_MESSAGES_TEMPLATED), len(LOG_MESSAGES_PLAIN)))
+    
+    # Fill-ins are only drawn for templated lines; None marks a plain line
+    templated_pos = np.flatnonzero(is_templated)
+    fill_idx = RNG.integers(0, len(LOG_FILL_FORMATS), len(templated_pos))
+    fill_low, fill_high = np.array(LOG_FILL_RANGES).T
+    fill_values = RNG.integers(fill_low[fill_idx], fill_high[fill_idx], endpoint=True)
+    fill_text = [None] * n
+    for pos, kind, value in zip(templated_pos.tolist(), fill_idx.tolist(), fill_values.tolist()):
+        fill_text[pos] = LOG_FILL_FORMATS[kind].format(value)
+    
+    # Sort logs by timestamp
+    order = np.argsort(us_offsets)
+    
+    start_us = wall_clock_us(start_time)
+    dates = {}
+    
+    us_offsets = us_offsets.tolist()
+    service_idx = service_idx.tolist()
+    levels_idx = levels_idx.tolist()
+    msg_idx = msg_idx.tolist()
+    
+    # Local aliases keep global lookups out of the per-line loop
+    log_lines = []
+    append = log_lines.append
+    split_us = split_wall_clock_us
+    line_fmt = LOG_LINE_FORMAT
+    ts_fmt = LOG_TIMESTAMP_FORMAT
+    plain, templated = LOG_MESSAGES_PLAIN, LOG_MESSAGES_TEMPLATED
+    S, L = SERVICES, LOG_LEVELS
+    for i in order.tolist():
+        fill = fill_text[i]
+        if fill is None:
+            message = plain[msg_idx[i]]
+        else:
+            message = templated[msg_idx[i]].format(fill)
+        year, month, day, hour, minute, sec, us = split_us(start_us + us_offsets[i], dates)
+        timestamp_str = ts_fmt % (year, month, day, hour, minute, sec, us // 1000)
+        append(line_fmt % (timestamp_str, L[levels_idx[i]], S[service_idx[i]], message))
+
+    return log_lines
+
+
+async def _build_log_lines(num_logs: int, start_time: datetime) -> list[str]:
+    """Run build_log_lines inline, or in the default executor for large batches"""
+    if num_logs > LOGS_OFFLOAD_THRESHOLD:
+        # Keep large batches off the event loop so concurrent requests aren't stalled
+        return await asyncio.get_running_loop().run_in_executor(
+            None, build_log_lines, num_logs, start_time
+        )
+    return build_log_lines(num_logs, start_time)
+
+
+async def iter_log_chunks(log_lines: list[str]):
+    """Yield newline-joined log lines in chunks of roughly LOGS_STREAM_CHUNK_SIZE characters"""
+    # The separator goes before every chunk but the first, so the concatenated
+    # stream matches "\n".join(log_lines) without a trailing newline
+    buf = []
+    size = 0
+    first = True
+    for line in log_lines:
+        buf.append(line)
+        size += len(line) + 1
+        if size >= LOGS_STREAM_CHUNK_SIZE:
+            chunk = "\n".join(buf)
+            yield chunk if first else "\n" + chunk
+            first = False
+            buf.clear()
+            size = 0
+    if buf:
+        chunk = "\n".join(buf)
+        yield chunk if first else "\n" + chunk
+
+
+def generate_service_metrics(services: list[str]) -> list[dict]:
+    """Generate metrics for all services in one batch"""
+    n = len(services)
+    
     # Base values with some randomization
-    cpu_usage = round(random.uniform(5, 95), 2)
-    memory_mb = random.randint(128, 2048)
-    p99_latency = round(random.uniform(10, 500), 2)
-    request_rate = round(random.uniform(10, 1000), 2)
-    error_rate = round(random.uniform(0, 5), 2)
+    cpu_usage = np.round(RNG.uniform(5, 95, n), 2)
+    memory_mb = RNG.integers(128, 2048, n, endpoint=True)
+    p99_latency = np.round(RNG.uniform(10, 500, n), 2)
+    request_rate = np.round(RNG.uniform(10, 1000, n), 2)
+    error_rate = np.round(RNG.uniform(0, 5, n), 2)
     
     # Memory leak score: higher values indicate potential issues
     # Simulate some services with potential leaks
-    if random.random() < 0.2:  # 20% chance of elevated leak score
-        memory_leak_score = round(random.uniform(60, 95), 2)
-    else:
-        memory_leak_score = round(random.uniform(0, 40), 2)
+    leak_hi_mask = RNG.random(n) < 0.2  # 20% chance of elevated leak score
+    memory_leak_score = np.where(
+        leak_hi_mask,
+        np.round(RNG.uniform(60, 95, n), 2),
+        np.round(RNG.uniform(0, 40, n), 2)
+    )
     
     # Detect anomalies based on thresholds
     anomaly_detected = (
-        cpu_usage > 85 or
-        p99_latency > 400 or
-        error_rate > 3 or
-        memory_leak_score > 70
+        (cpu_usage > 85) |
+        (p99_latency > 400) |
+        (error_rate > 3) |
+        (memory_leak_score > 70)
     )
     
-    return ServiceMetrics(
-        service_name=service,
-        cpu_usage_percent=cpu_usage,
-        memory_mb=memory_mb,
-        p99_latency_ms=p99_latency,
-        request_rate_per_sec=request_rate,
-        error_rate_percent=error_rate,
-        memory_leak_score=memory_leak_score,
-        anomaly_detected=anomaly_detected
-    )
-
-
-def generate_commit(service: str, timestamp: datetime) -> Commit:
-    """Generate a single commit for a service"""
-    commit_hash = ''.join(random.choices('0123456789abcdef', k=7))
-    author = random.choice(DEVELOPERS)
-    commit_type = random.choice(COMMIT_TYPES)
-    message = random.choice(COMMIT_MESSAGES)
-    full_message = f"{commit_type}: {message}"
-    
-    files_changed = random.randint(1, 15)
-    insertions = random.randint(5, 200)
-    deletions = random.randint(1, 100)
-    
-    return Commit(
-        commit_hash=commit_hash,
-        author=author,
-        date=timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-        message=full_message,
-        service=service,
-        files_changed=files_changed,
-        insertions=insertions,
-        deletions=deletions
-    )
-
+    # Plain dicts shaped like ServiceMetrics; values are generated in-range above
+    return [
+        {
+            "service_name": service,
+            "cpu_usage_percent": cpu,
+            "memory_mb": memory,
+            "p99_latency_ms": latency,
+            "request_rate_per_sec": rate,
+            "error_rate_percent": errors,
+            "memory_leak_score": leak,
+            "anomaly_detected": anomaly
+        }
+        for service, cpu, memory, latency, rate, errors, leak, anomaly in zip(
+            services,
+            cpu_usage.tolist(),
+            memory_mb.tolist(),
+            p99_latency.tolist(),
+            request_rate.tolist(),
+            error_rate.tolist(),
+            memory_leak_score.tolist(),
+            anomaly_detected.tolist()
+        )
+    ]
 
-def format_commit(commit: Commit) -> str:
-    """Format a commit as a git log style string"""
-    return (
-        f"commit {commit.commit_hash}\n"
-        f"Author: {commit.author}\n"
-        f"Date:   {commit.date}\n"
-        f"Service: {commit.service}\n"
-        f"\n"
-        f"    {commit.message}\n"
-        f"\n"
-        f"    {commit.files_changed} files changed, "
-        f"{commit.insertions} insertions(+), {commit.deletions} deletions(-)\n"
-    )
 
-def throw_error():
-    time.sleep(3)
+async def throw_error():
+    await asyncio.sleep(3)
     ERROR_MESSAGES = [
         "Internal server error",
         "Database connection failed",
@@ -232,7 +353,7 @@ def throw_error():
     return {"status": 500, "msg": random.choice(ERROR_MESSAGES)}
 
 @app.get("/")
-def read_root():
+async def read_root():
     """Root endpoint with API information"""
     # return {
     #     "message": "Kubernetes Cluster Monitor API",
@@ -242,11 +363,14 @@ def read_root():
     #         "/commit_history": "Get concatenated commit history of services"
     #     }
     # }
-    return random.choice([{"status": 200}, throw_error()])
+    # Only pay the simulated error delay when the error branch is picked
+    if random.random() < 0.5:
+        return await throw_error()
+    return {"status": 200}
 
 
 @app.get("/logs")
-def get_logs(num_logs: Optional[int] = Query(default=100, ge=1, le=10000)):
+async def get_logs(num_logs: Optional[int] = Query(default=100, ge=1, le=10000)):
     """
     Get concatenated logs from all services in the cluster
     
@@ -256,34 +380,13 @@ def get_logs(num_logs: Optional[int] = Query(default=100, ge=1, le=10000)):
     Returns:
         Dictionary with logs and metadata
     """
-    logs = []
-    
     # Generate logs across a time range
     end_time = datetime.now()
     start_time = end_time - timedelta(hours=1)
+    start_iso = start_time.isoformat()
+    end_iso = end_time.isoformat()
     
-    # Generate logs for each service
-    logs_per_service = num_logs // len(SERVICES)
-    remainder = num_logs % len(SERVICES)
-    
-    for idx, service in enumerate(SERVICES):
-        service_log_count = logs_per_service + (1 if idx < remainder else 0)
-        
-        for i in range(service_log_count):
-            # Distribute timestamps across the time range
-            timestamp = start_time + timedelta(
-                seconds=random.uniform(0, 3600)
-            )
-            logs.append({
-                "timestamp": timestamp,
-                "line": generate_log_line(service, timestamp)
-            })
-    
-    # Sort logs by timestamp
-    logs.sort(key=lambda x: x["timestamp"])
-    
-    # Format output
-    log_lines = [log["line"] for log in logs]
+    log_lines = await _build_log_lines(num_logs, start_time)
     
     return {
         "cluster_name": "production-cluster-01",
@@ -291,15 +394,33 @@ def get_logs(num_logs: Optional[int] = Query(default=100, ge=1, le=10000)):
         "services": SERVICES,
         "log_count": len(log_lines),
         "time_range": {
-            "start": start_time.isoformat(),
-            "end": end_time.isoformat()
+            "start": start_iso,
+            "end": end_iso
         },
         "logs": "\n".join(log_lines)
     }
 
 
-@app.get("/commit_history", response_model=CommitHistoryResponse)
-def get_commit_history(num_commits: Optional[int] = Query(default=50, ge=1, le=1000)):
+@app.get("/logs/stream")
+async def stream_logs(num_logs: Optional[int] = Query(default=100, ge=1, le=10000)):
+    """
+    Stream concatenated logs from all services in the cluster as plain text
+    
+    Args:
+        num_logs: Number of log lines to return (default: 100, max: 10000)
+    
+    Returns:
+        StreamingResponse with the log lines, sent in ~64 KiB chunks
+    """
+    start_time = datetime.now() - timedelta(hours=1)
+    
+    log_lines = await _build_log_lines(num_logs, start_time)
+    
+    return StreamingResponse(iter_log_chunks(log_lines), media_type="text/plain")
+
+
+@app.get("/commit_history", responses={200: {"model": CommitHistoryResponse}})
+async def get_commit_history(num_commits: Optional[int] = Query(default=50, ge=1, le=1000)):
     """
     Get concatenated commit history from all services in the cluster
     
@@ -307,64 +428,89 @@ def get_commit_history(num_commits: Optional[int] = Query(default=50, ge=1, le=1
         num_commits: Number of commits to return (default: 50, max: 1000)
     
     Returns:
-        CommitHistoryResponse with concatenated git-style commit history
+        Dictionary shaped like CommitHistoryResponse with concatenated git-style commit history
     """
-    commits = []
+    commit_lines = []
     
     # Generate commits across a time range (last 30 days)
     end_time = datetime.now()
     start_time = end_time - timedelta(days=30)
+    start_iso = start_time.isoformat()
+    end_iso = end_time.isoformat()
+    
+    # Split commits evenly across services, first services take the remainder
+    n = num_commits
+    commits_per_service, remainder = divmod(n, len(SERVICES))
+    service_counts = [commits_per_service + (1 if idx < remainder else 0) for idx in range(len(SERVICES))]
+    service_idx = np.repeat(np.arange(len(SERVICES)), service_counts).tolist()
     
-    # Generate commits for each service
-    commits_per_service = num_commits // len(SERVICES)
-    remainder = num_commits % len(SERVICES)
+    # Draw all random fields for every commit in one batch
+    us_offsets = (RNG.uniform(0, 30 * 24 * 3600, n) * US_PER_SEC).astype(np.int64)
+    authors = RNG.integers(0, len(DEVELOPERS), n).tolist()
+    types = RNG.integers(0, len(COMMIT_TYPES), n).tolist()
+    msgs = RNG.integers(0, len(COMMIT_MESSAGES), n).tolist()
+    files = RNG.integers(1, 15, n, endpoint=True).tolist()
+    ins = RNG.integers(5, 200, n, endpoint=True).tolist()
+    dels = RNG.integers(1, 100, n, endpoint=True).tolist()
     
-    for idx, service in enumerate(SERVICES):
-        service_commit_count = commits_per_service + (1 if idx < remainder else 0)
-        
-        for i in range(service_commit_count):
-            # Distribute timestamps across the time range
-            timestamp = start_time + timedelta(
-                seconds=random.uniform(0, 30 * 24 * 3600)
-            )
-            commits.append({
-                "timestamp": timestamp,
-                "commit": generate_commit(service, timestamp)
-            })
+    # 28 random bits per commit, rendered as a 7-char short hash by COMMIT_FORMAT
+    hashes = RNG.integers(0, 1 << 28, n).tolist()
     
     # Sort commits by timestamp (most recent first)
-    commits.sort(key=lambda x: x["timestamp"], reverse=True)
+    order = np.argsort(-us_offsets)
+    us_offsets = us_offsets.tolist()
     
-    # Format output
-    commit_lines = [format_commit(commit["commit"]) for commit in commits]
+    start_us = wall_clock_us(start_time)
+    dates = {}
     
-    return CommitHistoryResponse(
-        cluster_name="production-cluster-01",
-        total_commits=len(commits),
-        services=SERVICES,
-        time_range={
-            "start": start_time.isoformat(),
-            "end": end_time.isoformat()
+    # Local aliases keep global lookups out of the per-commit loop
+    D, T, M, S = DEVELOPERS, COMMIT_TYPES, COMMIT_MESSAGES, SERVICES
+    append = commit_lines.append
+    split_us = split_wall_clock_us
+    commit_fmt = COMMIT_FORMAT
+    date_fmt = COMMIT_DATE_FORMAT
+    for i in order.tolist():
+        date_str = date_fmt % split_us(start_us + us_offsets[i], dates)[:6]
+        append(commit_fmt % (
+            hashes[i], D[authors[i]], date_str, S[service_idx[i]],
+            T[types[i]], M[msgs[i]], files[i], ins[i], dels[i]
+        ))
+    
+    return {
+        "cluster_name": "production-cluster-01",
+        "total_commits": len(commit_lines),
+        "services": SERVICES,
+        "time_range": {
+            "start": start_iso,
+            "end": end_iso
         },
-        commits="\n".join(commit_lines)
-    )
+        "commits": "\n".join(commit_lines)
+    }
 
 
-@app.get("/metrics", response_model=MetricsResponse)
-def get_metrics():
+@app.get("/metrics", responses={200: {"model": MetricsResponse}})
+async def get_metrics():
     """
     Get performance metrics for all services in the cluster
     
     Returns:
-        MetricsResponse with CPU, latency, memory, and anomaly detection data
+        Dictionary shaped like MetricsResponse with CPU, latency, memory, and anomaly detection data
     """
-    service_metrics = [generate_service_metrics(service) for service in SERVICES]
+    # Coalesce bursty scrapes: reuse the last snapshot while it is younger than the TTL
+    now = time.monotonic()
+    if METRICS_CACHE["resp"] is not None and now - METRICS_CACHE["ts"] < METRICS_CACHE_TTL:
+        return METRICS_CACHE["resp"]
     
-    return MetricsResponse(
-        timestamp=datetime.now().isoformat(),
-        cluster_name="production-cluster-01",
-        services=service_metrics
-    )
+    service_metrics = generate_service_metrics(SERVICES)
+    
+    resp = {
+        "timestamp": datetime.now().isoformat(),
+        "cluster_name": "production-cluster-01",
+        "services": service_metrics
+    }
+    METRICS_CACHE["ts"] = now
+    METRICS_CACHE["resp"] = resp
+    return resp
 
 
 if __name__ == "__main__":